@@ -1,20 +1,21 @@
 import asyncio
-import os
-import random
-from typing import Dict
+import itertools
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Any
+from urllib.parse import quote
 
 import httpx
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
-from opentelemetry import trace
-from opentelemetry.exporter.jaeger.thrift import JaegerExporter
+from fastapi.responses import StreamingResponse
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.sdk.trace.sampling import ParentBasedTraceIdRatio
 from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
 from opentelemetry.propagate import inject, set_global_textmap
+from starlette.background import BackgroundTask
+
+from common.responses import ORJSONResponse
+from observability.tracing import init_tracing
 
 # Service registry (in production, use service discovery like Consul/etcd)
 SERVICE_REGISTRY = {
@@ -22,59 +23,220 @@ SERVICE_REGISTRY = {
     "service-b": ["http://service-b:8001"],
 }
 
+# Headers that apply to a single connection and must not be proxied
+HOP_BY_HOP_HEADERS = frozenset(
+    {
+        "connection",
+        "keep-alive",
+        "proxy-authenticate",
+        "proxy-authorization",
+        "te",
+        "trailer",
+        "trailers",
+        "transfer-encoding",
+        "upgrade",
+    }
+)
+
+# Request headers dropped before forwarding (ASGI header names are lowercase bytes)
+SKIPPED_REQUEST_HEADERS = frozenset(
+    name.encode() for name in HOP_BY_HOP_HEADERS | {"host", "content-length"}
+)
+
+# Methods whose request body is forwarded upstream
+BODY_METHODS = frozenset({"POST", "PUT", "PATCH"})
+
 # Circuit breaker configuration
 FAILURE_THRESHOLD = 5
 RESET_TIMEOUT = 60  # seconds
-circuit_state: Dict[str, dict] = {}
+
+
+@dataclass(slots=True)
+class CircuitState:
+    """Per-service circuit breaker state"""
+
+    failures: int = 0
+    last_failure: float = 0.0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
 
 # Configure tracing
-sampler = ParentBasedTraceIdRatio(0.3)
-trace.set_tracer_provider(
-    TracerProvider(
-        resource=Resource.create(
-            {
-                "service.name": "api-gateway",
-                "service.version": "0.1.0",
-                "deployment.environment": os.getenv("DEPLOYMENT_ENV", "development"),
-            }
+tracer = init_tracing("api-gateway")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared pooled client so upstream connections are reused across requests
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_keepalive_connections=100,
+            max_connections=200,
+            keepalive_expiry=30.0,
         ),
-        sampler=sampler,
+        timeout=httpx.Timeout(30.0, connect=2.0),
     )
-)
-jaeger_exporter = JaegerExporter(agent_host_name="jaeger", agent_port=6831)
-trace.get_tracer_provider().add_span_processor(BatchSpanProcessor(jaeger_exporter))
+    yield
+    await app.state.http.aclose()
 
-app = FastAPI(title="API Gateway")
-FastAPIInstrumentor.instrument_app(app)
 
-# Initialize HTTP client
-http_client = httpx.AsyncClient(timeout=30.0)
+app = FastAPI(
+    title="API Gateway", lifespan=lifespan, default_response_class=ORJSONResponse
+)
+FastAPIInstrumentor.instrument_app(app)
 
 # Set W3C TraceContext as the global propagator
 set_global_textmap(TraceContextTextMapPropagator())
 
 
-async def check_circuit_breaker(service: str) -> bool:
-    """Check if circuit breaker is tripped for a service"""
-    if service not in circuit_state:
-        circuit_state[service] = {"failures": 0, "last_failure": 0}
-
-    state = circuit_state[service]
-    if state["failures"] >= FAILURE_THRESHOLD:
-        if (asyncio.get_event_loop().time() - state["last_failure"]) > RESET_TIMEOUT:
-            state["failures"] = 0
+async def try_reset_circuit(state: CircuitState, now: float) -> bool:
+    """Close a tripped circuit once the reset timeout has elapsed"""
+    async with state.lock:
+        if state.failures < FAILURE_THRESHOLD:
+            return True
+        if (now - state.last_failure) > RESET_TIMEOUT:
+            state.failures = 0
             return True
         return False
-    return True
 
 
-async def record_failure(service: str):
+def record_failure(state: CircuitState, now: float):
     """Record a service failure"""
-    if service not in circuit_state:
-        circuit_state[service] = {"failures": 0, "last_failure": 0}
+    state.failures += 1
+    state.last_failure = now
+
+
+def filter_hop_by_hop(headers: httpx.Headers) -> dict:
+    """Drop connection-level headers from an upstream response"""
+    return {k: v for k, v in headers.items() if k not in HOP_BY_HOP_HEADERS}
+
+
+def upstream_path(request: Request, path: str) -> str:
+    """Path to forward upstream, keeping the client's percent-encoding"""
+    raw_path = request.scope.get("raw_path")
+    if raw_path is None:
+        return "/" + quote(path, safe="/")
+    # Drop the leading "/{service}" segment from the still-encoded path
+    return "/" + raw_path.decode("latin-1").split("/", 2)[2]
+
+
+def request_attributes(
+    service: str, path: str, request: Request, endpoint: httpx.URL
+) -> dict[str, Any]:
+    """Span attributes identifying a forwarded request"""
+    return {
+        "gateway.service": service,
+        "gateway.path": path,
+        "gateway.method": request.method,
+        "gateway.endpoint": str(endpoint),
+    }
+
+
+def bind_service(service: str, endpoints: list[str]):
+    """Build the forwarding handler for a service with its state bound in"""
+    state = CircuitState()
+    # Round-robin iterator over the service's pre-parsed endpoint URLs
+    upstreams = itertools.cycle([httpx.URL(endpoint) for endpoint in endpoints])
+
+    async def forward(path: str, request: Request) -> StreamingResponse:
+        with tracer.start_as_current_span("gateway_route") as span:
+            # Check circuit breaker (closed circuit is a single compare); raised
+            # outside the try so it stays a 503 but still shows up in traces
+            if state.failures >= FAILURE_THRESHOLD and not await try_reset_circuit(
+                state, monotonic()
+            ):
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"Service '{service}' is temporarily unavailable",
+                )
 
-    circuit_state[service]["failures"] += 1
-    circuit_state[service]["last_failure"] = asyncio.get_event_loop().time()
+            # Select the next endpoint in round-robin order (simple load balancing)
+            endpoint = next(upstreams)
+
+            try:
+                # Prepare headers with trace context
+                headers = httpx.Headers(
+                    [
+                        (name, value)
+                        for name, value in request.headers.raw
+                        if name not in SKIPPED_REQUEST_HEADERS
+                    ]
+                )
+                inject(headers)  # This will inject W3C trace context headers
+                # The raw body is passed through as-is, so never let httpx ask for
+                # a compression the client did not request
+                if "accept-encoding" not in headers:
+                    headers["accept-encoding"] = "identity"
+
+                # Forward the request
+                url = endpoint.copy_with(
+                    path=upstream_path(request, path),
+                    query=request.scope["query_string"] or None,
+                )
+
+                # Stream the request body through instead of buffering it
+                body = None
+                if request.method in BODY_METHODS:
+                    body = request.stream()
+                    request_length = request.headers.get("content-length")
+                    if request_length is not None:
+                        # Keeps a fixed-length body instead of chunked encoding
+                        headers["content-length"] = request_length
+
+                http_client = request.app.state.http
+                upstream_request = http_client.build_request(
+                    request.method, url, headers=headers, content=body
+                )
+                response = await http_client.send(upstream_request, stream=True)
+
+                # Release the pooled connection if anything fails before the
+                # StreamingResponse takes ownership of the upstream body
+                try:
+                    # Record request and response details in a single call
+                    if span.is_recording():
+                        attrs = request_attributes(service, path, request, endpoint)
+                        attrs["http.status_code"] = response.status_code
+                        content_length = response.headers.get("content-length")
+                        if content_length is not None:
+                            attrs["http.response_length"] = int(content_length)
+                        span.set_attributes(attrs)
+
+                    # Pass the upstream body through untouched instead of re-encoding it
+                    return StreamingResponse(
+                        response.aiter_raw(),
+                        status_code=response.status_code,
+                        headers=filter_hop_by_hop(response.headers),
+                        background=BackgroundTask(response.aclose),
+                    )
+                except BaseException:
+                    await response.aclose()
+                    raise
+
+            except httpx.RequestError as e:
+                record_failure(state, monotonic())
+                if span.is_recording():
+                    span.set_attributes(
+                        request_attributes(service, path, request, endpoint)
+                    )
+                span.record_exception(e)
+                raise HTTPException(status_code=503, detail=str(e))
+
+            except Exception as e:
+                if span.is_recording():
+                    span.set_attributes(
+                        request_attributes(service, path, request, endpoint)
+                    )
+                span.record_exception(e)
+                raise HTTPException(status_code=500, detail=str(e))
+
+    return forward
+
+
+# One forwarding handler per registered service, built once at startup
+DISPATCH = {
+    service: bind_service(service, endpoints)
+    for service, endpoints in SERVICE_REGISTRY.items()
+}
 
 
 @app.get("/health")
@@ -86,73 +248,7 @@ async def health_check():
 @app.api_route("/{service}/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def gateway_route(service: str, path: str, request: Request):
     """Main gateway route handler"""
-    tracer = trace.get_tracer(__name__)
-
-    with tracer.start_as_current_span("gateway_route") as span:
-        try:
-            # Check if service exists
-            if service not in SERVICE_REGISTRY:
-                raise HTTPException(
-                    status_code=404, detail=f"Service '{service}' not found"
-                )
-
-            # Check circuit breaker
-            if not await check_circuit_breaker(service):
-                raise HTTPException(
-                    status_code=503,
-                    detail=f"Service '{service}' is temporarily unavailable",
-                )
-
-            # Get service endpoints and select one randomly (simple load balancing)
-            endpoints = SERVICE_REGISTRY[service]
-            endpoint = random.choice(endpoints)
-
-            # Add tracing context
-            span.set_attributes(
-                {
-                    "gateway.service": service,
-                    "gateway.path": path,
-                    "gateway.method": request.method,
-                    "gateway.endpoint": endpoint,
-                }
-            )
-
-            # Prepare headers with trace context
-            headers = dict(request.headers)
-            inject(headers)  # This will inject W3C trace context headers
-
-            # Forward the request
-            url = f"{endpoint}/{path}"
-            body = await request.body()
-
-            response = await http_client.request(
-                method=request.method, url=url, headers=headers, content=body
-            )
-
-            # Record response metrics
-            span.set_attributes(
-                {
-                    "http.status_code": response.status_code,
-                    "http.response_length": len(response.content),
-                }
-            )
-
-            return JSONResponse(
-                content=response.json(),
-                status_code=response.status_code,
-                headers=dict(response.headers),
-            )
-
-        except httpx.RequestError as e:
-            await record_failure(service)
-            span.record_exception(e)
-            raise HTTPException(status_code=503, detail=str(e))
-
-        except Exception as e:
-            span.record_exception(e)
-            raise HTTPException(status_code=500, detail=str(e))
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    await http_client.aclose()
+    handler = DISPATCH.get(service)
+    if handler is None:
+        raise HTTPException(status_code=404, detail=f"Service '{service}' not found")
+    return await handler(path, request)
@@ -0,0 +1,67 @@
+import os
+
+from grpc import Compression
+from opentelemetry import trace
+from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter
+from opentelemetry.sdk.trace.sampling import ParentBased, Sampler, TraceIdRatioBased
+
+# Process-wide provider, created by the first init_tracing call
+_provider: TracerProvider | None = None
+
+
+def make_exporter() -> OTLPSpanExporter:
+    """Build the OTLP/gRPC exporter that ships spans to the OTel Collector"""
+    # OTLP/gRPC avoids the UDP packet-size limit of the Jaeger Thrift agent.
+    # A unix:// endpoint targets a co-located collector, which needs no TLS.
+    endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://otel-collector:4317")
+    return OTLPSpanExporter(
+        endpoint=endpoint,
+        insecure=True if endpoint.startswith("unix:") else None,
+        compression=Compression.Gzip,
+    )
+
+
+def make_processor(exporter: SpanExporter) -> BatchSpanProcessor:
+    """Build a batch processor sized to avoid queue-full span drops under load"""
+    return BatchSpanProcessor(
+        exporter,
+        max_queue_size=int(os.getenv("OTEL_BSP_MAX_QUEUE_SIZE", "8192")),
+        max_export_batch_size=int(os.getenv("OTEL_BSP_MAX_EXPORT_BATCH_SIZE", "256")),
+        schedule_delay_millis=float(os.getenv("OTEL_BSP_SCHEDULE_DELAY", "1000")),
+        export_timeout_millis=float(os.getenv("OTEL_BSP_EXPORT_TIMEOUT", "5000")),
+    )
+
+
+def init_tracing(service_name: str, *, sampler: Sampler | None = None) -> trace.Tracer:
+    """Configure tracing for this process and return a tracer for the service
+
+    The resource, provider, exporter and processor are built on the first call
+    only; later calls reuse them.
+    """
+    global _provider
+    if _provider is None:
+        if sampler is None and "OTEL_TRACES_SAMPLER" not in os.environ:
+            # Head sampling: unsampled roots get a NonRecordingSpan, no attributes
+            ratio = float(os.getenv("OTEL_TRACES_SAMPLER_ARG", "0.01"))
+            sampler = ParentBased(root=TraceIdRatioBased(ratio))
+
+        # With sampler=None the SDK reads OTEL_TRACES_SAMPLER / OTEL_TRACES_SAMPLER_ARG
+        _provider = TracerProvider(
+            resource=Resource.create(
+                {
+                    "service.name": service_name,
+                    "service.version": "0.1.0",
+                    "deployment.environment": os.getenv(
+                        "DEPLOYMENT_ENV", "development"
+                    ),
+                }
+            ),
+            sampler=sampler,
+        )
+        _provider.add_span_processor(make_processor(make_exporter()))
+        trace.set_tracer_provider(_provider)
+
+    return _provider.get_tracer(service_name)
@@ -1,86 +1,78 @@
 import asyncio
 import os
+from contextlib import asynccontextmanager
 
 import httpx
+import orjson
 from fastapi import FastAPI, Request
-from opentelemetry import trace
-from opentelemetry.exporter.jaeger.thrift import JaegerExporter
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-from opentelemetry.instrumentation.requests import RequestsInstrumentor
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.sdk.trace.sampling import ParentBasedTraceIdRatio
-from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
 from opentelemetry.trace.status import Status, StatusCode
-from opentelemetry.propagate import extract, inject
-
-# Configure tracing with sampling
-sampler = ParentBasedTraceIdRatio(0.3)  # Sample 30% of traces
-trace.set_tracer_provider(
-    TracerProvider(
-        resource=Resource.create(
-            {
-                "service.name": "service-a",
-                "service.version": "0.1.0",
-                "deployment.environment": os.getenv("DEPLOYMENT_ENV", "development"),
-            }
+from opentelemetry.propagate import inject
+
+from common.responses import ORJSONResponse
+from observability.tracing import init_tracing
+
+# Configure tracing
+tracer = init_tracing("service-a")
+
+# Seconds of simulated work per request (disabled by default)
+SIMULATE_LATENCY = float(os.getenv("SIMULATE_LATENCY", "0"))
+
+SERVICE_B_URL = httpx.URL("http://service-b:8001/process")
+
+# Constant span attributes, shared across requests
+_CALL_B_ATTRS = {"endpoint": "/call-service-b", "target_service": "service-b"}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create a single pooled httpx client for the lifetime of the app
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_keepalive_connections=100,
+            max_connections=200,
+            keepalive_expiry=30.0,
         ),
-        sampler=sampler,  # Enable the sampler
+        timeout=httpx.Timeout(30.0, connect=2.0),
     )
-)
-jaeger_exporter = JaegerExporter(agent_host_name="jaeger", agent_port=6831)
-trace.get_tracer_provider().add_span_processor(BatchSpanProcessor(jaeger_exporter))
+    yield
+    await app.state.http.aclose()
+
 
 # Initialize FastAPI
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 FastAPIInstrumentor.instrument_app(app)
-RequestsInstrumentor().instrument()
-
-# Create a single httpx client instance
-http_client = httpx.AsyncClient()
 
 
 @app.get("/call-service-b")
 async def call_service_b(request: Request):
-    # Extract context from incoming request
-    context = extract(request.headers)
-    tracer = trace.get_tracer(__name__)
-    
-    with tracer.start_as_current_span("call_service_b", context=context) as span:
+    with tracer.start_as_current_span(
+        "call_service_b", attributes=_CALL_B_ATTRS
+    ) as span:
         try:
-            span.set_attributes(
-                {"endpoint": "/call-service-b", "target_service": "service-b"}
-            )
-
-            # Fake a delay
-            await asyncio.sleep(1)
+            # Optional fake delay for demoing latency in traces
+            if SIMULATE_LATENCY:
+                await asyncio.sleep(SIMULATE_LATENCY)
 
             # Prepare headers for context propagation
             headers = {}
             inject(headers)  # This will inject W3C trace context headers
 
-            # Use the shared http_client instance
-            response = await http_client.get(
-                "http://service-b:8001/process", headers=headers
-            )
+            # Use the shared pooled client
+            response = await request.app.state.http.get(SERVICE_B_URL, headers=headers)
             response.raise_for_status()
 
-            span.set_attributes(
-                {
-                    "http.status_code": response.status_code,
-                    "http.response_content_length": len(response.content),
-                }
-            )
-            return {"service_b_response": response.json()}
+            if span.is_recording():
+                span.set_attributes(
+                    {
+                        "http.status_code": response.status_code,
+                        "http.response_content_length": len(response.content),
+                    }
+                )
+            return {"service_b_response": orjson.loads(response.content)}
 
         except Exception as e:
             span.set_status(Status(StatusCode.ERROR))
             span.record_exception(e)
             raise
-
-
-# Add cleanup for http_client
-@app.on_event("shutdown")
-async def shutdown_event():
-    await http_client.aclose()